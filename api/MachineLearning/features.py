@@ -0,0 +1,21 @@
+# Fields the model sees, in the column order used during training
+FEATURE_FIELDS = [
+    'airline', 'from', 'to', 'route', 'class_category', 'stops_category',
+    'arr_daytime_category', 'dep_daytime_category', 'duration_in_min', 'stops', 'day', 'month'
+]
+
+
+def normalize_features(data):
+    # Same typed, stripped values for the model, the surrogate and the cache key,
+    # so equal keys always mean equal model inputs
+    features = {}
+    for field in FEATURE_FIELDS:
+        value = data[field]
+        if field == 'duration_in_min':
+            value = float(value)
+        elif field in ('stops', 'day', 'month'):
+            value = int(value)
+        else:
+            value = str(value).strip()
+        features[field] = value
+    return features
@@ -1,42 +1,37 @@
 import joblib
 import pandas as pd
 import os
+from contextlib import nullcontext
+from MachineLearning.surrogate import load_surrogate, predict_surrogate
+from MachineLearning.prediction_cache import load_prediction_cache, model_version, BATCH_CACHE_MAX_ENTRIES
+from MachineLearning.features import FEATURE_FIELDS, normalize_features
+
+# Inference tiers: 'full' runs the complete pipeline, 'preview' uses the distilled surrogate
+TIER_FULL = 'full'
+TIER_PREVIEW = 'preview'
+TIERS = (TIER_FULL, TIER_PREVIEW)
 
 # Loads the complete pipeline (model)
-pipeline = joblib.load(os.path.join(os.path.dirname(__file__), 'models', 'modelo_final.pkl'))
+model_path = os.path.join(os.path.dirname(__file__), 'models', 'modelo_final.pkl')
+pipeline = joblib.load(model_path)
+
+# Cache of full-pipeline results shared by all worker processes, keyed by features and model version
+pipeline_version = model_version(model_path)
+prediction_cache = load_prediction_cache()
+# Batched itinerary pricing gets its own capped share of the same file
+batch_cache = load_prediction_cache(max_entries=BATCH_CACHE_MAX_ENTRIES, table='batch_prediction_cache')
+
+# Loads the cheap surrogate used for previews (None if it was not distilled yet, or from another model)
+surrogate = load_surrogate(expected_version=pipeline_version)
 
 
 def predict_price(data):
     try:
-        # Extracts the necessary fields from the input data
-        airline = data['airline']
-        from_location = data['from']
-        to_location = data['to']
-        route = data['route']
-        class_category = data['class_category']
-        stops_category = data['stops_category']
-        arr_daytime_category = data['arr_daytime_category']
-        dep_daytime_category = data['dep_daytime_category']
-        duration = float(data['duration_in_min'])
-        stops = int(data['stops'])
-        dep_day = int(data['day'])
-        dep_month = int(data['month'])
+        # Extracts and normalizes the necessary fields from the input data
+        features = normalize_features(data)
 
         # Creates a DataFrame with the same columns used during training
-        input_df = pd.DataFrame({
-            'airline': [airline],
-            'from': [from_location],
-            'to': [to_location],
-            'route': [route],
-            'class_category': [class_category],
-            'stops_category': [stops_category],
-            'arr_daytime_category': [arr_daytime_category],
-            'dep_daytime_category': [dep_daytime_category],
-            'duration_in_min': [duration],
-            'stops': [stops],
-            'day': [dep_day],
-            'month': [dep_month]
-        })
+        input_df = pd.DataFrame([features], columns=FEATURE_FIELDS)
 
         # Performs prediction using the complete pipeline
         predicted_price = pipeline.predict(input_df)
@@ -46,3 +41,68 @@ def predict_price(data):
     except Exception as e:
         print(f"Error during prediction: {e}")
         return None
+
+
+def predict_price_tiered(data, tier=TIER_FULL, full_pipeline_slot=nullcontext):
+    # Returns the predicted price together with the tier that actually answered.
+    # full_pipeline_slot is entered only around the pipeline call, so surrogate and cache answers never wait for it
+    try:
+        # Normalized once: the surrogate, the cache key and the pipeline all see the same values
+        data = normalize_features(data)
+    except Exception as e:
+        print(f"Error during prediction: {e}")
+        return None, TIER_FULL
+
+    if tier == TIER_PREVIEW and surrogate is not None:
+        predicted_price = predict_surrogate(surrogate, data)
+        if predicted_price is not None:
+            return predicted_price, TIER_PREVIEW
+
+    # Full tier requested, or the surrogate does not cover this route variant
+    if prediction_cache is not None:
+        cached_price = prediction_cache.get(data, pipeline_version)
+        if cached_price is not None:
+            return cached_price, TIER_FULL
+
+    with full_pipeline_slot():
+        predicted_price = predict_price(data)
+    if predicted_price is not None and prediction_cache is not None:
+        prediction_cache.put(data, pipeline_version, predicted_price)
+
+    return predicted_price, TIER_FULL
+
+
+def predict_prices(rows, tier=TIER_FULL, full_pipeline_slot=nullcontext):
+    # Batched version of predict_price_tiered: every row left to the full tier goes through a single pipeline call
+    rows = [normalize_features(row) for row in rows]
+    prices = [None] * len(rows)
+    tiers = [TIER_FULL] * len(rows)
+
+    if tier == TIER_PREVIEW and surrogate is not None:
+        for i, row in enumerate(rows):
+            predicted_price = predict_surrogate(surrogate, row)
+            if predicted_price is not None:
+                prices[i] = predicted_price
+                tiers[i] = TIER_PREVIEW
+
+    # Rows already priced by any worker come from the shared batch cache, in a few chunked queries
+    pending = [i for i, price in enumerate(prices) if price is None]
+    if batch_cache is not None and pending:
+        cached_prices = batch_cache.get_many([rows[i] for i in pending], pipeline_version)
+        for i, cached_price in zip(pending, cached_prices):
+            prices[i] = cached_price
+        pending = [i for i in pending if prices[i] is None]
+
+    # Only the cache misses go through the pipeline, and their results are shared back
+    if pending:
+        with full_pipeline_slot():
+            try:
+                input_df = pd.DataFrame([rows[i] for i in pending], columns=FEATURE_FIELDS)
+                for i, predicted_price in zip(pending, pipeline.predict(input_df)):
+                    prices[i] = float(predicted_price)
+            except Exception as e:
+                print(f"Error during batch prediction: {e}")
+        if batch_cache is not None:
+            batch_cache.put_many([(rows[i], prices[i]) for i in pending if prices[i] is not None], pipeline_version)
+
+    return prices, tiers
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from MachineLearning.features import FEATURE_FIELDS, normalize_features
+
+# Shared on-disk cache: every worker process opens the same SQLite file (WAL mode)
+CACHE_PATH = os.environ.get(
+    'PREDICTION_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'database', 'prediction_cache.db')
+)
+# Maximum number of cached predictions (0 disables the cache)
+CACHE_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', '100000'))
+# Batched (itinerary leg) predictions live in their own table with their own cap,
+# so a single search cannot evict the /predict working set
+BATCH_CACHE_MAX_ENTRIES = int(os.environ.get('PREDICTION_BATCH_CACHE_MAX_ENTRIES', '50000'))
+
+# Size check and eviction run once every EVICT_EVERY writes of a process
+EVICT_EVERY = 500
+# A hit only refreshes its last_used timestamp if it is older than this (seconds), to keep reads read-only
+TOUCH_INTERVAL = 60
+# Keys per SELECT/UPDATE in get_many (below SQLite's limit on query parameters)
+GET_MANY_CHUNK = 500
+
+def model_version(model_path):
+    # Content hash of the model file: a retrained model never serves stale prices
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def cache_key(data):
+    # Normalized feature tuple, so '180', 180 and 180.0 share the same entry
+    features = normalize_features(data)
+    return json.dumps([features[field] for field in FEATURE_FIELDS], separators=(',', ':'))
+
+
+def load_prediction_cache(path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, table='prediction_cache'):
+    # The cache is optional: if it is disabled or its file cannot be opened, predictions run without it
+    if max_entries <= 0:
+        return None
+    try:
+        return PredictionCache(path, max_entries, table)
+    except Exception as e:
+        print(f"Prediction cache unavailable at path: {path} ({e})")
+        return None
+
+
+class PredictionCache:
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, table='prediction_cache'):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table  # Internal constant, never user input
+        self._local = threading.local()  # sqlite3 connections cannot be shared between threads
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                price REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (key, model_version)
+            )
+        ''')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_last_used ON {self.table} (last_used)')
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')  # Readers in other workers never block on writers
+            conn.execute('PRAGMA synchronous=NORMAL')  # Losing the last writes on power loss is fine for a cache
+            self._local.conn = conn
+        return conn
+
+    def get(self, data, version):
+        return self.get_many([data], version)[0]
+
+    def get_many(self, rows, version):
+        # Cached price of each row (None on a miss): one SELECT per chunk of keys,
+        # and the touches of stale hits batched into a single transaction
+        prices = [None] * len(rows)
+        try:
+            keys = [cache_key(row) for row in rows]
+            unique_keys = list(dict.fromkeys(keys))
+            conn = self._connect()
+
+            found = {}
+            for start in range(0, len(unique_keys), GET_MANY_CHUNK):
+                chunk = unique_keys[start:start + GET_MANY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for key, price, last_used in conn.execute(
+                    f'SELECT key, price, last_used FROM {self.table} WHERE model_version = ? AND key IN ({placeholders})',
+                    [version] + chunk
+                ):
+                    found[key] = (price, last_used)
+
+            now = time.time()
+            stale = [key for key, (_, last_used) in found.items() if now - last_used > TOUCH_INTERVAL]
+            if stale:
+                for start in range(0, len(stale), GET_MANY_CHUNK):
+                    chunk = stale[start:start + GET_MANY_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    conn.execute(
+                        f'UPDATE {self.table} SET last_used = ? WHERE model_version = ? AND key IN ({placeholders})',
+                        [now, version] + chunk
+                    )
+                conn.commit()
+
+            for i, key in enumerate(keys):
+                if key in found:
+                    prices[i] = found[key][0]
+
+        except Exception as e:
+            print(f"Error reading prediction cache: {e}")
+        return prices
+
+    def put(self, data, version, price):
+        self.put_many([(data, price)], version)
+
+    def put_many(self, items, version):
+        # Stores (data, price) pairs in a single transaction
+        try:
+            now = time.time()
+            conn = self._connect()
+            conn.executemany(
+                f'INSERT OR REPLACE INTO {self.table} (key, model_version, price, last_used) VALUES (?, ?, ?, ?)',
+                [(cache_key(data), version, float(price), now) for data, price in items]
+            )
+            conn.commit()
+
+            with self._lock:
+                before = self._writes
+                self._writes += len(items)
+                evict = self._writes // EVICT_EVERY > before // EVICT_EVERY
+            if evict:
+                self.evict()
+
+        except Exception as e:
+            print(f"Error writing prediction cache: {e}")
+
+    def evict(self):
+        # Drops the least recently used entries above max_entries (old model versions are never hit, so they age out first)
+        conn = self._connect()
+        excess = conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(f'''
+                DELETE FROM {self.table} WHERE rowid IN (
+                    SELECT rowid FROM {self.table} ORDER BY last_used ASC LIMIT ?
+                )
+            ''', (excess,))
+            conn.commit()
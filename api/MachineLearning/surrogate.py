@@ -0,0 +1,52 @@
+import joblib
+import os
+
+# Path of the distilled surrogate model (generated by scripts/distill_surrogate.py)
+SURROGATE_PATH = os.path.join(os.path.dirname(__file__), 'models', 'modelo_surrogate.pkl')
+
+
+def load_surrogate(path=SURROGATE_PATH, expected_version=None):
+    # The surrogate is optional: without it every call falls back to the full pipeline
+    if not os.path.exists(path):
+        print(f"Surrogate model not found at path: {path}")
+        return None
+
+    surrogate = joblib.load(path)
+
+    # A surrogate distilled from another version of modelo_final.pkl would serve stale previews
+    if expected_version is not None and surrogate.get('source_model_version') != expected_version:
+        print(f"Surrogate model at {path} was distilled from another model version, ignoring it")
+        return None
+    return surrogate
+
+
+def surrogate_key(data):
+    # One small linear model is fitted per route variant
+    return (
+        data['airline'],
+        data['from'],
+        data['to'],
+        data['class_category'],
+        data['stops_category'],
+    )
+
+
+def predict_surrogate(surrogate, data):
+    try:
+        coefficients = surrogate['coefficients'].get(surrogate_key(data))
+        if coefficients is None:
+            return None  # Route variant not covered by the distillation
+
+        intercept, duration_coef, day_coef = coefficients
+        duration = float(data['duration_in_min'])
+        dep_day = int(data['day'])
+        dep_month = int(data['month'])
+
+        # Plain Python arithmetic: no DataFrame, no pipeline
+        price = intercept + duration_coef * duration + day_coef * dep_day
+        price += surrogate['month_offsets'].get(dep_month, 0.0)
+        return price
+
+    except Exception as e:
+        print(f"Error during surrogate prediction: {e}")
+        return None
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import jsonify
+
+# Limits for the full model pipeline, per worker process, configurable through environment variables.
+# PREDICT_MAX_CONCURRENCY + PREDICT_MAX_QUEUE must stay below the server's thread count per process,
+# so requests waiting for the model can never hold every thread and the dropdown routes keep answering.
+PREDICT_MAX_CONCURRENCY = int(os.environ.get('PREDICT_MAX_CONCURRENCY', '1'))
+PREDICT_MAX_QUEUE = int(os.environ.get('PREDICT_MAX_QUEUE', '4'))
+PREDICT_QUEUE_TIMEOUT_MS = int(os.environ.get('PREDICT_QUEUE_TIMEOUT_MS', '2000'))
+PREDICT_RETRY_AFTER_S = int(os.environ.get('PREDICT_RETRY_AFTER_S', '1'))
+
+
+class AdmissionRejected(Exception):
+    # Raised when a request is shed; turned into a 503 by shed_response
+    def __init__(self, retry_after_s):
+        super().__init__('Server busy, please retry later')
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    # Concurrency limiter with a bounded wait queue and a queue deadline per request
+    def __init__(self, max_concurrency, max_queue, queue_timeout_ms, retry_after_s=1):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.retry_after_s = retry_after_s
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+
+        # Counters exported by /metrics
+        self._admitted = 0
+        self._shed_queue_full = 0
+        self._shed_deadline = 0
+        self._queue_time_total = 0.0
+        self._queue_time_max = 0.0
+
+    def acquire(self):
+        # Returns True once a slot is taken, False if the request must be shed
+        start = time.monotonic()
+        with self._cond:
+            if self._in_flight < self.max_concurrency and self._queued == 0:
+                self._in_flight += 1
+                self._admitted += 1
+                return True
+
+            if self._queued >= self.max_queue:
+                self._shed_queue_full += 1
+                return False
+
+            self._queued += 1
+            deadline = start + self.queue_timeout
+            try:
+                while self._in_flight >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed_deadline += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._queued -= 1
+
+            self._in_flight += 1
+            self._admitted += 1
+            queue_time = time.monotonic() - start
+            self._queue_time_total += queue_time
+            self._queue_time_max = max(self._queue_time_max, queue_time)
+            return True
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        # Holds a slot for the duration of the block, or raises AdmissionRejected if the request is shed
+        if not self.acquire():
+            raise AdmissionRejected(self.retry_after_s)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'queue_timeout_ms': int(self.queue_timeout * 1000),
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'admitted': self._admitted,
+                'shed_queue_full': self._shed_queue_full,
+                'shed_deadline': self._shed_deadline,
+                'queue_time_ms_total': round(self._queue_time_total * 1000, 3),
+                'queue_time_ms_max': round(self._queue_time_max * 1000, 3),
+            }
+
+
+# Flask error handler for AdmissionRejected (fails fast with 503 when overloaded)
+def shed_response(error):
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(error.retry_after_s)
+    return response, 503
+
+
+# Shared limiter for the full pipeline (used by /predict and /itineraries)
+predict_admission = AdmissionController(
+    PREDICT_MAX_CONCURRENCY, PREDICT_MAX_QUEUE, PREDICT_QUEUE_TIMEOUT_MS, PREDICT_RETRY_AFTER_S
+)
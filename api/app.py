@@ -2,12 +2,17 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
 import sqlite3
-from MachineLearning.predict import predict_price
+from MachineLearning.predict import predict_price_tiered, predict_prices, TIERS, TIER_FULL
+from admission import predict_admission, AdmissionRejected, shed_response
+from route_graph import RouteGraphStore, best_itineraries, OBJECTIVES
 import os
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Requests shed by the admission controller fail fast with 503 and Retry-After
+app.register_error_handler(AdmissionRejected, shed_response)
+
 # Definir o caminho absoluto para o arquivo category_mapping.json
 base_dir = os.path.dirname(os.path.abspath(__file__))
 json_path = os.path.join(base_dir, 'MachineLearning', 'models', 'category_mapping.json')
@@ -16,16 +21,18 @@ json_path = os.path.join(base_dir, 'MachineLearning', 'models', 'category_mappin
 with open(json_path, 'r') as f:
     category_mapping = json.load(f)
 
+# Caminho absoluto do banco de dados SQLite (usado pelas rotas e pelo grafo de rotas)
+db_path = os.path.join(base_dir, '..', 'database', 'dropdown_data.db')
+
+# Grafo de rotas em memória (reconstruído apenas quando o banco de dados muda)
+route_graph_store = RouteGraphStore(db_path, category_mapping)
+if os.path.exists(db_path):
+    route_graph_store.get()
+
 
 # Helper function to connect to the SQLite database (used for retrieving flight data)
 def connect_db():
-    # Get the base directory of the current script (app.py)
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Construct the absolute path to the database
-    db_path = os.path.join(base_dir, '..', 'database', 'dropdown_data.db')
-    
-    # Connect to the database
+    # Connect to the database (same file the route graph is built from)
     return sqlite3.connect(db_path)
 
 
@@ -397,6 +404,11 @@ def predict():
         if missing_fields:
             return jsonify({'error': f"Missing fields: {', '.join(missing_fields)}"}), 400
 
+        # Optional inference tier: 'preview' for browsing, 'full' (default) for the final quote
+        tier = data.get('tier', TIER_FULL)
+        if tier not in TIERS:
+            return jsonify({'error': f"Invalid tier: {tier}"}), 400
+
         # Extract day and month from dep_date
         dep_date = data['dep_date']
         dep_day = int(dep_date.split('-')[2])
@@ -408,17 +420,105 @@ def predict():
         data['route'] = f"{data['from']}-{data['to']}"
 
         # Call the predict function from predict.py
-        predicted_price = predict_price(data)
+        # Only calls that reach the full pipeline take an admission slot (previews never wait)
+        predicted_price, tier = predict_price_tiered(data, tier, predict_admission.slot)
 
         # Check if the prediction was successful
         if predicted_price is not None:
-            return jsonify({'predicted_price': f"{predicted_price:.2f} INR"}), 200
+            return jsonify({'predicted_price': f"{predicted_price:.2f} INR", 'tier': tier}), 200
         else:
             return jsonify({'error': 'Prediction failed'}), 500
+    except AdmissionRejected:
+        raise
     except Exception as e:
         print(f"Error during prediction: {e}")
         return jsonify({'error': 'Server error'}), 500
 
+#########################################################################################
+# API Route - itineraries - cheapest or fastest itineraries with one or two connections
+#########################################################################################
+
+@app.route('/itineraries', methods=['GET'])
+def get_itineraries():
+    from_city_name = request.args.get('from_city')
+    to_city_name = request.args.get('to_city')
+    class_category_name = request.args.get('class_category')
+    dep_date = request.args.get('dep_date')
+    objective = request.args.get('objective', 'cheapest')
+    tier = request.args.get('tier', TIER_FULL)
+
+    if not (from_city_name and to_city_name and class_category_name and dep_date) or from_city_name == to_city_name:
+        return jsonify({'error': 'Invalid selection'}), 400
+    if objective not in OBJECTIVES:
+        return jsonify({'error': f"Invalid objective: {objective}"}), 400
+    if tier not in TIERS:
+        return jsonify({'error': f"Invalid tier: {tier}"}), 400
+
+    try:
+        max_connections = int(request.args.get('max_connections', 2))
+        limit = int(request.args.get('limit', 5))
+        dep_day = int(dep_date.split('-')[2])
+        dep_month = int(dep_date.split('-')[1])
+    except (ValueError, IndexError):
+        return jsonify({'error': 'Invalid selection'}), 400
+    if max_connections not in (1, 2) or not 1 <= limit <= 20:
+        return jsonify({'error': 'Invalid selection'}), 400
+
+    try:
+        graph = route_graph_store.get()
+        max_legs = max_connections + 1
+        legs = graph.candidate_legs(from_city_name, to_city_name, class_category_name, max_legs)
+
+        # Price every candidate leg in one batched model call (all legs on the departure date)
+        rows = [
+            {
+                'airline': leg.airline, 'from': leg.from_city, 'to': leg.to_city,
+                'route': f"{leg.from_city}-{leg.to_city}", 'class_category': leg.class_category,
+                'stops_category': leg.stops_category, 'arr_daytime_category': leg.arr_daytime_category,
+                'dep_daytime_category': leg.dep_daytime_category, 'duration_in_min': float(leg.duration),
+                'stops': leg.stops, 'day': dep_day, 'month': dep_month
+            }
+            for leg in legs
+        ]
+        prices, tiers = predict_prices(rows, tier, predict_admission.slot)
+        if legs and all(price is None for price in prices):
+            return jsonify({'error': 'Prediction failed'}), 500
+        leg_tiers = dict(zip(legs, tiers))
+
+        itineraries = []
+        for path in best_itineraries(legs, prices, from_city_name, to_city_name, objective, max_legs, limit):
+            itineraries.append({
+                'connections': len(path) - 1,
+                'total_price': round(sum(price for _, price in path), 2),
+                'total_duration_in_min': sum(leg.duration for leg, _ in path),
+                'legs': [
+                    {
+                        'airline': leg.airline, 'from': leg.from_city, 'to': leg.to_city,
+                        'stops': leg.stops, 'stops_category': leg.stops_category,
+                        'duration_in_min': leg.duration,
+                        'dep_daytime_category': leg.dep_daytime_category,
+                        'arr_daytime_category': leg.arr_daytime_category,
+                        'predicted_price': round(price, 2), 'tier': leg_tiers[leg]
+                    }
+                    for leg, price in path
+                ]
+            })
+
+        return jsonify({'itineraries': itineraries, 'currency': 'INR'}), 200
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        print(f"Error during itinerary search: {e}")
+        return jsonify({'error': 'Server error'}), 500
+
+###############################################################################
+# API Route - metrics - admission control counters for the model routes
+###############################################################################
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({'predict_admission': predict_admission.stats()})
+
 if __name__ == '__main__':
     print("Starting the Flask server...")
     app.run(debug=True)
@@ -0,0 +1,160 @@
+import heapq
+import os
+import sqlite3
+import threading
+from collections import defaultdict, namedtuple
+
+# One edge per distinct flight variant in flight_routes (names, as the model expects them)
+Edge = namedtuple('Edge', [
+    'airline', 'from_city', 'to_city', 'class_category', 'stops_category',
+    'stops', 'duration', 'dep_daytime_category', 'arr_daytime_category'
+])
+
+OBJECTIVES = ('cheapest', 'fastest')
+
+
+class RouteGraph:
+    # Cities are the nodes, airline/stops/duration variants are the edges
+    def __init__(self, edges):
+        self.edges = edges
+        self.edges_from = defaultdict(list)
+        self.edges_into = defaultdict(list)
+        for edge in edges:
+            self.edges_from[edge.from_city].append(edge)
+            self.edges_into[edge.to_city].append(edge)
+
+    def hops(self, city, max_hops, class_category, reverse=False):
+        # Minimum number of legs of the given class from (or, with reverse, to) a city, up to max_hops
+        distance = {city: 0}
+        frontier = [city]
+        for hop in range(1, max_hops + 1):
+            next_frontier = []
+            for current in frontier:
+                neighbours = self.edges_into[current] if reverse else self.edges_from[current]
+                for edge in neighbours:
+                    if edge.class_category != class_category:
+                        continue
+                    neighbour = edge.from_city if reverse else edge.to_city
+                    if neighbour not in distance:
+                        distance[neighbour] = hop
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return distance
+
+    def candidate_legs(self, origin, destination, class_category, max_legs):
+        # Legs that can be part of an origin -> destination itinerary of at most max_legs legs
+        hops_from = self.hops(origin, max_legs - 1, class_category)
+        hops_to = self.hops(destination, max_legs - 1, class_category, reverse=True)
+        return [
+            edge for edge in self.edges
+            if edge.class_category == class_category
+            and edge.from_city in hops_from and edge.to_city in hops_to
+            and hops_from[edge.from_city] + 1 + hops_to[edge.to_city] <= max_legs
+            and not (edge.from_city == origin and edge.to_city == destination)  # Direct flights are served by /predict
+            and edge.from_city != destination and edge.to_city != origin  # Never usable: itineraries end at destination, start at origin
+        ]
+
+
+def load_route_graph(conn, category_mapping):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT DISTINCT airlines.name, from_cities.name, to_cities.name,
+               class_category.name, stops_category.name, flight_routes.stops,
+               flight_routes.duration, flight_routes.dep_daytime_category,
+               flight_routes.arr_daytime_category
+        FROM flight_routes
+        JOIN airlines ON flight_routes.airline = airlines.id
+        JOIN cities AS from_cities ON flight_routes.from_city = from_cities.id
+        JOIN cities AS to_cities ON flight_routes.to_city = to_cities.id
+        JOIN class_category ON flight_routes.class_category = class_category.id
+        JOIN stops_category ON flight_routes.stops_category = stops_category.id
+    ''')
+
+    # Daytime categories are stored as their index in category_mapping
+    edges = [
+        Edge(
+            airline, from_city, to_city, class_category, stops_category, int(stops), int(duration),
+            category_mapping['dep_daytime_category'][int(dep_daytime)],
+            category_mapping['arr_daytime_category'][int(arr_daytime)]
+        )
+        for (airline, from_city, to_city, class_category, stops_category,
+             stops, duration, dep_daytime, arr_daytime) in cursor.fetchall()
+    ]
+    return RouteGraph(edges)
+
+
+class RouteGraphStore:
+    # Keeps the graph in memory and rebuilds it only when the database file changes
+    def __init__(self, db_path, category_mapping):
+        self.db_path = db_path
+        self.category_mapping = category_mapping
+        self._lock = threading.Lock()
+        self._graph = None
+        self._signature = None
+
+    def _db_signature(self):
+        stat = os.stat(self.db_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        signature = self._db_signature()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    conn = sqlite3.connect(self.db_path)
+                    try:
+                        self._graph = load_route_graph(conn, self.category_mapping)
+                    finally:
+                        conn.close()
+                    self._signature = signature
+                    print(f"Route graph built with {len(self._graph.edges)} legs")
+        return self._graph
+
+
+def best_itineraries(legs, prices, origin, destination, objective='cheapest', max_legs=3, limit=5):
+    # Best-first search over the priced candidate legs; itineraries come out in cost order
+    def leg_cost(leg, price):
+        # Primary objective first, the other one breaks ties
+        return (price, leg.duration) if objective == 'cheapest' else (leg.duration, price)
+
+    legs_by_pair = defaultdict(list)
+    for leg, price in zip(legs, prices):
+        if price is not None:
+            legs_by_pair[(leg.from_city, leg.to_city)].append((leg, price))
+
+    # Costs add up per leg, so a leg outside the `limit` best of its city pair can always be swapped
+    # for a better one on the same pair: it can never appear in a top-`limit` itinerary
+    legs_from = defaultdict(list)
+    for (from_city, _), pair_legs in legs_by_pair.items():
+        legs_from[from_city].extend(heapq.nsmallest(limit, pair_legs, key=lambda item: leg_cost(*item)))
+
+    counter = 0  # Tie-breaker so the heap never compares paths
+    heap = [((0, 0), counter, origin, ())]
+    expanded = defaultdict(int)
+    itineraries = []
+
+    while heap and len(itineraries) < limit:
+        cost, _, city, path = heapq.heappop(heap)
+        if city == destination:
+            itineraries.append(path)
+            continue
+        if len(path) == max_legs:
+            continue
+
+        # Pruning: partial paths ending in the same city through the same cities have the same
+        # possible continuations, so only the `limit` best of them can lead to a returned itinerary
+        visited = frozenset([origin]).union(leg.to_city for leg, _ in path)
+        if expanded[(city, visited)] >= limit:
+            continue
+        expanded[(city, visited)] += 1
+
+        for leg, price in legs_from[city]:
+            if leg.to_city in visited:
+                continue
+            if leg.to_city == destination and not path:
+                continue
+            step = leg_cost(leg, price)
+            counter += 1
+            heapq.heappush(heap, ((cost[0] + step[0], cost[1] + step[1]), counter, leg.to_city, path + ((leg, price),)))
+
+    return itineraries
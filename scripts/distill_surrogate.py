@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import joblib
+import numpy as np
+import pandas as pd
+
+# Get the base directory of 'backend'
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(base_dir, 'api'))
+
+from MachineLearning.surrogate import SURROGATE_PATH, predict_surrogate
+from MachineLearning.features import FEATURE_FIELDS
+from MachineLearning.prediction_cache import model_version
+
+# Departure days used to fit the surrogate and the (disjoint) days used to evaluate it
+TRAIN_DAYS = [1, 5, 9, 13, 17, 21, 25, 28]
+EVAL_DAYS = [3, 11, 19, 27]
+
+# Number of single-row calls timed for the latency part of the report
+LATENCY_SAMPLES = 200
+
+
+def load_route_variants(db_path, category_mapping):
+    # Every distinct route variant in flight_routes, decoded back to the names the model expects
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT DISTINCT airlines.name, from_cities.name, to_cities.name,
+               class_category.name, stops_category.name, flight_routes.duration,
+               flight_routes.stops, flight_routes.dep_daytime_category,
+               flight_routes.arr_daytime_category, flight_routes.month
+        FROM flight_routes
+        JOIN airlines ON flight_routes.airline = airlines.id
+        JOIN cities AS from_cities ON flight_routes.from_city = from_cities.id
+        JOIN cities AS to_cities ON flight_routes.to_city = to_cities.id
+        JOIN class_category ON flight_routes.class_category = class_category.id
+        JOIN stops_category ON flight_routes.stops_category = stops_category.id
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            'airline': airline, 'from': from_city, 'to': to_city, 'route': f"{from_city}-{to_city}",
+            'class_category': class_category, 'stops_category': stops_category,
+            'arr_daytime_category': category_mapping['arr_daytime_category'][int(arr_daytime)],
+            'dep_daytime_category': category_mapping['dep_daytime_category'][int(dep_daytime)],
+            'duration_in_min': float(duration), 'stops': int(stops), 'month': int(month)
+        }
+        for (airline, from_city, to_city, class_category, stops_category,
+             duration, stops, dep_daytime, arr_daytime, month) in rows
+    ]
+
+
+def build_samples(variants, days):
+    # Cross every route variant with the given departure days (columns in training order)
+    return pd.DataFrame([dict(variant, day=day) for variant in variants for day in days], columns=FEATURE_FIELDS)
+
+
+def fit_surrogate(samples, prices):
+    samples = samples.assign(price=prices)
+
+    # Global month effect, taken from the residual against each route variant's mean price
+    variant_mean = samples.groupby(['airline', 'from', 'to', 'class_category', 'stops_category'])['price'].transform('mean')
+    month_offsets = (samples['price'] - variant_mean).groupby(samples['month']).mean()
+    month_offsets = {int(month): float(offset) for month, offset in month_offsets.items()}
+
+    # One least-squares fit price ~ intercept + duration + day per route variant
+    coefficients = {}
+    for key, group in samples.groupby(['airline', 'from', 'to', 'class_category', 'stops_category']):
+        target = group['price'].to_numpy() - group['month'].map(month_offsets).to_numpy()
+        features = np.column_stack([
+            np.ones(len(group)),
+            group['duration_in_min'].to_numpy(dtype=float),
+            group['day'].to_numpy(dtype=float),
+        ])
+        solution = np.linalg.lstsq(features, target, rcond=None)[0]
+        coefficients[key] = tuple(float(value) for value in solution)
+
+    return {'coefficients': coefficients, 'month_offsets': month_offsets}
+
+
+def time_per_call(predict, rows):
+    # Average wall-clock time of single-row calls, in milliseconds
+    start = time.perf_counter()
+    for row in rows:
+        predict(row)
+    return (time.perf_counter() - start) * 1000 / len(rows)
+
+
+def distill_surrogate():
+    # Define paths
+    db_path = os.path.join(base_dir, 'database', 'dropdown_data.db')
+    model_path = os.path.join(base_dir, 'api', 'MachineLearning', 'models', 'modelo_final.pkl')
+    category_mapping_path = os.path.join(base_dir, 'api', 'MachineLearning', 'models', 'category_mapping.json')
+    report_path = os.path.join(base_dir, 'api', 'MachineLearning', 'models', 'surrogate_report.json')
+
+    if not os.path.exists(db_path):
+        print(f"Database not found at path: {db_path} (run scripts/init_db.py first)")
+        return
+
+    with open(category_mapping_path, 'r') as f:
+        category_mapping = json.load(f)
+
+    pipeline = joblib.load(model_path)
+    variants = load_route_variants(db_path, category_mapping)
+    print(f"Loaded {len(variants)} route variants from {db_path}")
+
+    # Label the training grid with the full model in a single batched call
+    train_samples = build_samples(variants, TRAIN_DAYS)
+    surrogate = fit_surrogate(train_samples, pipeline.predict(train_samples))
+    surrogate['source_model_version'] = model_version(model_path)
+    joblib.dump(surrogate, SURROGATE_PATH)
+    print(f"Surrogate with {len(surrogate['coefficients'])} route models saved to {SURROGATE_PATH}")
+
+    # Accuracy against the full model on days the surrogate never saw
+    eval_samples = build_samples(variants, EVAL_DAYS)
+    full_prices = pipeline.predict(eval_samples)
+    eval_rows = eval_samples.to_dict('records')
+    surrogate_prices = np.array([predict_surrogate(surrogate, row) for row in eval_rows], dtype=float)
+    errors = surrogate_prices - full_prices
+
+    # Latency of one preview call against one full-pipeline call
+    rng = np.random.default_rng(0)
+    latency_rows = [eval_rows[i] for i in rng.choice(len(eval_rows), size=min(LATENCY_SAMPLES, len(eval_rows)), replace=False)]
+    full_ms = time_per_call(lambda row: pipeline.predict(pd.DataFrame([row], columns=FEATURE_FIELDS)), latency_rows)
+    surrogate_ms = time_per_call(lambda row: predict_surrogate(surrogate, row), latency_rows)
+
+    report = {
+        'route_models': len(surrogate['coefficients']),
+        'eval_samples': len(eval_rows),
+        'mae_inr': float(np.mean(np.abs(errors))),
+        'rmse_inr': float(np.sqrt(np.mean(errors ** 2))),
+        'mape_percent': float(np.mean(np.abs(errors) / np.abs(full_prices)) * 100),
+        'full_ms_per_call': full_ms,
+        'surrogate_ms_per_call': surrogate_ms,
+        'speedup': full_ms / surrogate_ms if surrogate_ms else None,
+    }
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    print(f"Accuracy-vs-latency report saved to {report_path}")
+
+
+if __name__ == "__main__":
+    distill_surrogate()
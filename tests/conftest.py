@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The API modules are imported the same way app.py imports them (from inside 'api'),
+# and the scripts as standalone modules
+sys.path.insert(0, os.path.join(base_dir, '..', 'api'))
+sys.path.insert(0, os.path.join(base_dir, '..', 'scripts'))
+
+# The tests never create the shared prediction cache in the repository's database folder;
+# the ones that need a cache build it under tmp_path
+os.environ['PREDICTION_CACHE_MAX_ENTRIES'] = '0'
+os.environ['PREDICTION_BATCH_CACHE_MAX_ENTRIES'] = '0'
+
+MODEL_PATH = os.path.join(base_dir, '..', 'api', 'MachineLearning', 'models', 'modelo_final.pkl')
+
+
+def _dados_voo(**overrides):
+    data = {
+        'airline': 'Indigo', 'from': 'Delhi', 'to': 'Mumbai', 'route': 'Delhi-Mumbai',
+        'class_category': 'Economy', 'stops_category': 'Non-stop',
+        'arr_daytime_category': 'Daytime Arrival', 'dep_daytime_category': 'Daytime Departure',
+        'duration_in_min': 180, 'stops': 0, 'day': 15, 'month': 12
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def dados_voo():
+    # Builds the input of one /predict call, with optional overrides
+    return _dados_voo
+
+
+@pytest.fixture
+def modulo_predict():
+    # predict.py loads modelo_final.pkl at import time, and the model is not versioned with the code
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip('modelo_final.pkl not available')
+    from MachineLearning import predict
+    return predict
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+from admission import AdmissionController, AdmissionRejected, shed_response
+
+
+# Test 1: Requests beyond the concurrency limit wait in the queue and are shed when it is full
+def test_fila_cheia():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout_ms=5000)
+    assert controller.acquire()
+
+    # The second request waits for the slot held by the first one
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(controller.acquire()))
+    waiter.start()
+    while controller.stats()['queued'] == 0:
+        time.sleep(0.001)
+
+    # The queue is full: the third request fails fast
+    assert not controller.acquire()
+
+    controller.release()
+    waiter.join()
+    assert results == [True]
+
+    stats = controller.stats()
+    assert stats['admitted'] == 2
+    assert stats['shed_queue_full'] == 1
+    assert stats['in_flight'] == 1
+
+
+# Test 2: A queued request is shed once its deadline passes
+def test_prazo_expirado():
+    controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout_ms=50)
+    assert controller.acquire()
+    assert not controller.acquire()
+
+    stats = controller.stats()
+    assert stats['shed_deadline'] == 1
+    assert stats['queued'] == 0
+
+    # Once the slot is released new requests are admitted again
+    controller.release()
+    assert controller.acquire()
+
+
+# Test 3: Shed requests answer 503 with Retry-After and slots are always given back
+def test_resposta_503():
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout_ms=50, retry_after_s=7)
+    app = Flask(__name__)
+    app.register_error_handler(AdmissionRejected, shed_response)
+
+    @app.route('/ok')
+    def ok():
+        with controller.slot():
+            return jsonify({'ok': True})
+
+    @app.route('/falha')
+    def falha():
+        with controller.slot():
+            raise RuntimeError('pipeline error')
+
+    client = app.test_client()
+
+    # With the only slot taken and no queue, the request is shed
+    assert controller.acquire()
+    response = client.get('/ok')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    controller.release()
+
+    assert client.get('/ok').status_code == 200
+
+    # A view that raises still gives its slot back
+    assert client.get('/falha').status_code == 500
+    assert controller.stats()['in_flight'] == 0
+    assert client.get('/ok').status_code == 200
+
+
+# Test 4: Previews answered by the surrogate never wait for a slot; full-pipeline calls do
+def test_previa_sem_vaga(monkeypatch, dados_voo, modulo_predict):
+    predict = modulo_predict
+    monkeypatch.setattr(predict, 'prediction_cache', None)
+    monkeypatch.setattr(predict, 'batch_cache', None)
+    monkeypatch.setattr(predict, 'surrogate', {
+        'coefficients': {('Indigo', 'Delhi', 'Mumbai', 'Economy', 'Non-stop'): (1000.0, 20.0, -10.0)},
+        'month_offsets': {},
+    })
+
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout_ms=50)
+    assert controller.acquire()
+
+    assert predict.predict_price_tiered(dados_voo(), 'preview', controller.slot) == (4450, 'preview')
+    assert predict.predict_prices([dados_voo()], 'preview', controller.slot) == ([4450], ['preview'])
+    with pytest.raises(AdmissionRejected):
+        predict.predict_price_tiered(dados_voo(), 'full', controller.slot)
+    with pytest.raises(AdmissionRejected):
+        predict.predict_prices([dados_voo()], 'full', controller.slot)
+
+    assert controller.stats()['admitted'] == 1
@@ -0,0 +1,129 @@
+import numpy as np
+
+from MachineLearning import prediction_cache
+from MachineLearning.prediction_cache import PredictionCache
+
+
+# Test 1: A result stored by one worker is served to another one (separate connections to the same file)
+def test_resultado_compartilhado(tmp_path, dados_voo):
+    path = str(tmp_path / 'prediction_cache.db')
+    worker_a = PredictionCache(path, max_entries=100)
+    worker_b = PredictionCache(path, max_entries=100)
+
+    assert worker_b.get(dados_voo(), 'v1') is None
+    worker_a.put(dados_voo(), 'v1', 5321.5)
+
+    # Equivalent inputs (string numbers, extra request fields) normalize to the same key
+    assert worker_b.get(dados_voo(duration_in_min='180.0', day='15', dep_date='2025-12-15'), 'v1') == 5321.5
+    # A different model version never sees the old result
+    assert worker_b.get(dados_voo(), 'v2') is None
+
+
+# Test 2: Eviction keeps the cache within max_entries, dropping the least recently used entries
+def test_limite_de_tamanho(tmp_path, monkeypatch, dados_voo):
+    monkeypatch.setattr(prediction_cache, 'EVICT_EVERY', 5)
+    cache = PredictionCache(str(tmp_path / 'prediction_cache.db'), max_entries=3)
+
+    for day in range(1, 11):
+        cache.put(dados_voo(day=day), 'v1', 1000 + day)
+
+    conn = cache._connect()
+    assert conn.execute('SELECT COUNT(*) FROM prediction_cache').fetchone()[0] == 3
+    assert cache.get(dados_voo(day=10), 'v1') == 1010
+    assert cache.get(dados_voo(day=1), 'v1') is None
+
+
+# Test 3: A batch of results is stored in one call and served per row
+def test_gravacao_em_lote(tmp_path, dados_voo):
+    cache = PredictionCache(str(tmp_path / 'prediction_cache.db'), max_entries=100)
+    cache.put_many([(dados_voo(day=1), 4100.0), (dados_voo(day=2), 4200.0)], 'v1')
+
+    assert cache.get(dados_voo(day=1), 'v1') == 4100.0
+    assert cache.get(dados_voo(day=2), 'v1') == 4200.0
+
+
+# Test 4: Batched pricing only sends cache misses to the pipeline and shares their results
+def test_precos_em_lote_com_cache(monkeypatch, tmp_path, dados_voo, modulo_predict):
+    predict = modulo_predict
+
+    class PipelineContador:
+        # Stands in for modelo_final.pkl and counts the rows it had to price
+        rows_seen = 0
+
+        def predict(self, input_df):
+            PipelineContador.rows_seen += len(input_df)
+            return np.full(len(input_df), 9999.0)
+
+    monkeypatch.setattr(predict, 'pipeline', PipelineContador())
+    monkeypatch.setattr(predict, 'batch_cache', PredictionCache(str(tmp_path / 'prediction_cache.db'), max_entries=100))
+    monkeypatch.setattr(predict, 'surrogate', None)
+
+    predict.batch_cache.put(dados_voo(day=1), predict.pipeline_version, 1234.0)
+    rows = [dados_voo(day=1), dados_voo(day=2), dados_voo(day=3)]
+
+    assert predict.predict_prices(rows) == ([1234.0, 9999.0, 9999.0], ['full', 'full', 'full'])
+    assert PipelineContador.rows_seen == 2
+
+    # A second search is answered entirely from the cache
+    assert predict.predict_prices(rows)[0] == [1234.0, 9999.0, 9999.0]
+    assert PipelineContador.rows_seen == 2
+
+
+# Test 5: An unusable cache location disables the cache instead of failing the import
+def test_cache_indisponivel(tmp_path):
+    blocked = tmp_path / 'blocked'
+    blocked.write_text('not a directory')
+
+    assert prediction_cache.load_prediction_cache(str(blocked / 'prediction_cache.db'), max_entries=100) is None
+    assert prediction_cache.load_prediction_cache(str(tmp_path / 'prediction_cache.db'), max_entries=0) is None
+    assert prediction_cache.load_prediction_cache(str(tmp_path / 'prediction_cache.db'), max_entries=100) is not None
+
+
+# Test 6: The cache key and the model input come from the same normalized features
+def test_normalizacao_unica(monkeypatch, tmp_path, dados_voo, modulo_predict):
+    predict = modulo_predict
+    seen = []
+
+    class PipelineRegistro:
+        # Stands in for modelo_final.pkl and records the airlines it was asked to price
+        def predict(self, input_df):
+            seen.extend(input_df['airline'])
+            return np.full(len(input_df), 5000.0)
+
+    monkeypatch.setattr(predict, 'pipeline', PipelineRegistro())
+    monkeypatch.setattr(predict, 'prediction_cache', PredictionCache(str(tmp_path / 'prediction_cache.db'), max_entries=100))
+
+    assert predict.predict_price_tiered(dados_voo(airline='Indigo '), 'full') == (5000.0, 'full')
+    assert predict.predict_price_tiered(dados_voo(airline='Indigo'), 'full') == (5000.0, 'full')
+    assert seen == ['Indigo']
+
+
+# Test 7: get_many answers a batch in row order, across chunks, and refreshes stale hits together
+def test_leitura_em_lote(monkeypatch, tmp_path, dados_voo):
+    monkeypatch.setattr(prediction_cache, 'GET_MANY_CHUNK', 2)
+    cache = PredictionCache(str(tmp_path / 'prediction_cache.db'), max_entries=100)
+    cache.put_many([(dados_voo(day=day), 1000.0 + day) for day in (1, 2, 3)], 'v1')
+
+    conn = cache._connect()
+    conn.execute('UPDATE prediction_cache SET last_used = 0')
+    conn.commit()
+
+    rows = [dados_voo(day=3), dados_voo(day=9), dados_voo(day=1), dados_voo(day=3), dados_voo(day=2)]
+    assert cache.get_many(rows, 'v1') == [1003.0, None, 1001.0, 1003.0, 1002.0]
+    assert cache.get_many(rows, 'v2') == [None] * 5
+    assert conn.execute('SELECT COUNT(*) FROM prediction_cache WHERE last_used = 0').fetchone()[0] == 0
+
+
+# Test 8: Batched results have their own capped table and never evict the /predict entries
+def test_tabelas_separadas(monkeypatch, tmp_path, dados_voo):
+    monkeypatch.setattr(prediction_cache, 'EVICT_EVERY', 5)
+    path = str(tmp_path / 'prediction_cache.db')
+    cache = PredictionCache(path, max_entries=100)
+    batch_cache = PredictionCache(path, max_entries=3, table='batch_prediction_cache')
+
+    cache.put(dados_voo(), 'v1', 5321.5)
+    batch_cache.put_many([(dados_voo(day=day), 1000.0 + day) for day in range(1, 11)], 'v1')
+
+    assert cache.get(dados_voo(), 'v1') == 5321.5
+    assert batch_cache.get(dados_voo(), 'v1') is None
+    assert batch_cache.get_many([dados_voo(day=day) for day in range(1, 11)], 'v1').count(None) == 7
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+
+from route_graph import Edge, RouteGraph, RouteGraphStore, best_itineraries
+
+
+def trecho(airline, from_city, to_city, duration):
+    return Edge(airline, from_city, to_city, 'Economy', 'Non-stop', 0, duration,
+                'Daytime Departure', 'Daytime Arrival')
+
+
+# Small network: Delhi -> Mumbai has a direct flight plus one- and two-connection options
+TRECHOS = [
+    trecho('Indigo', 'Delhi', 'Mumbai', 120),
+    trecho('Indigo', 'Delhi', 'Kolkata', 130),
+    trecho('Vistara', 'Delhi', 'Chennai', 160),
+    trecho('Indigo', 'Kolkata', 'Mumbai', 150),
+    trecho('Indigo', 'Kolkata', 'Chennai', 140),
+    trecho('SpiceJet', 'Chennai', 'Mumbai', 110),
+    trecho('SpiceJet', 'Hyderabad', 'Bangalore', 60),
+]
+PRECOS = {
+    ('Delhi', 'Kolkata'): 3000, ('Delhi', 'Chennai'): 6000, ('Kolkata', 'Mumbai'): 4000,
+    ('Kolkata', 'Chennai'): 1000, ('Chennai', 'Mumbai'): 1500,
+}
+
+
+def precificar(legs):
+    return [PRECOS[(leg.from_city, leg.to_city)] for leg in legs]
+
+
+# Test 1: Only legs that can belong to a connecting itinerary are priced
+def test_trechos_candidatos():
+    graph = RouteGraph(TRECHOS)
+    legs = graph.candidate_legs('Delhi', 'Mumbai', 'Economy', max_legs=2)
+    assert {(leg.from_city, leg.to_city) for leg in legs} == {
+        ('Delhi', 'Kolkata'), ('Delhi', 'Chennai'), ('Kolkata', 'Mumbai'), ('Chennai', 'Mumbai')
+    }
+    assert graph.candidate_legs('Delhi', 'Mumbai', 'Business', max_legs=3) == []
+
+
+# Test 2: Itineraries come out cheapest (or fastest) first, never as the direct flight
+def test_melhores_itinerarios():
+    graph = RouteGraph(TRECHOS)
+    legs = graph.candidate_legs('Delhi', 'Mumbai', 'Economy', max_legs=3)
+    prices = precificar(legs)
+
+    cheapest = best_itineraries(legs, prices, 'Delhi', 'Mumbai', 'cheapest', max_legs=3, limit=5)
+    routes = [[leg.to_city for leg, _ in path] for path in cheapest]
+    assert routes == [['Kolkata', 'Chennai', 'Mumbai'], ['Kolkata', 'Mumbai'], ['Chennai', 'Mumbai']]
+
+    fastest = best_itineraries(legs, prices, 'Delhi', 'Mumbai', 'fastest', max_legs=3, limit=1)
+    assert [leg.to_city for leg, _ in fastest[0]] == ['Chennai', 'Mumbai']
+
+
+# Test 3: The graph is rebuilt only when the database changes
+def test_reconstrucao_do_grafo(tmp_path):
+    db_path = str(tmp_path / 'dropdown_data.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE airlines (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE cities (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE stops_category (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE class_category (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE flight_routes (
+            id INTEGER PRIMARY KEY, airline INTEGER, from_city INTEGER, to_city INTEGER,
+            stops_category INTEGER, class_category INTEGER, duration INTEGER,
+            dep_daytime_category INTEGER, arr_daytime_category INTEGER, month INTEGER, stops INTEGER
+        );
+        INSERT INTO airlines VALUES (1, 'Indigo');
+        INSERT INTO cities VALUES (1, 'Delhi'), (2, 'Kolkata'), (3, 'Mumbai');
+        INSERT INTO stops_category VALUES (1, 'Non-stop');
+        INSERT INTO class_category VALUES (1, 'Economy');
+        INSERT INTO flight_routes VALUES (1, 1, 1, 2, 1, 1, 130, 0, 1, 2, 0), (2, 1, 1, 2, 1, 1, 130, 0, 1, 3, 0);
+    ''')
+    conn.commit()
+
+    category_mapping = {
+        'dep_daytime_category': ['Daytime Departure', 'Night Departure'],
+        'arr_daytime_category': ['Daytime Arrival', 'Night Arrival'],
+    }
+    store = RouteGraphStore(db_path, category_mapping)
+    graph = store.get()
+    assert graph.edges == [Edge('Indigo', 'Delhi', 'Kolkata', 'Economy', 'Non-stop', 0, 130,
+                                'Daytime Departure', 'Night Arrival')]
+    assert store.get() is graph
+
+    conn.execute('INSERT INTO flight_routes VALUES (3, 1, 2, 3, 1, 1, 150, 1, 1, 2, 0)')
+    conn.commit()
+    conn.close()
+    os.utime(db_path, ns=(0, os.stat(db_path).st_mtime_ns + 1))  # Guarantees a new mtime on coarse clocks
+    assert len(store.get().edges) == 2
+
+
+# Test 4: Reachability only follows legs of the requested class
+def test_trechos_candidatos_por_classe():
+    business = Edge('Vistara', 'Delhi', 'Hyderabad', 'Business', 'Non-stop', 0, 120,
+                    'Daytime Departure', 'Daytime Arrival')
+    graph = RouteGraph(TRECHOS + [business, trecho('SpiceJet', 'Hyderabad', 'Mumbai', 90)])
+
+    # Hyderabad -> Mumbai in Economy is only reachable from Delhi through a Business leg
+    legs = graph.candidate_legs('Delhi', 'Mumbai', 'Economy', max_legs=3)
+    assert ('Hyderabad', 'Mumbai') not in {(leg.from_city, leg.to_city) for leg in legs}
+
+
+# Cyclic network: every pair of cities is connected both ways, by two airlines
+CIDADES = ['Delhi', 'Mumbai', 'Kolkata', 'Chennai']
+TRECHOS_CICLICOS = [
+    trecho(airline, from_city, to_city, 60 + 17 * i + 11 * j + (29 if airline == 'Vistara' else 0))
+    for i, from_city in enumerate(CIDADES)
+    for j, to_city in enumerate(CIDADES)
+    for airline in ('Indigo', 'Vistara')
+    if from_city != to_city
+]
+
+
+def precificar_ciclico(legs):
+    return [1000 + 7 * leg.duration + (300 if leg.airline == 'Indigo' else 0) for leg in legs]
+
+
+# Test 5: Legs leaving the destination or entering the origin are never priced
+def test_trechos_candidatos_ciclicos():
+    graph = RouteGraph(TRECHOS_CICLICOS)
+    legs = graph.candidate_legs('Delhi', 'Mumbai', 'Economy', max_legs=3)
+
+    assert legs
+    assert all(leg.from_city != 'Mumbai' and leg.to_city != 'Delhi' for leg in legs)
+    assert all(not (leg.from_city == 'Delhi' and leg.to_city == 'Mumbai') for leg in legs)
+
+
+# Test 6: The pruned search returns the same costs as enumerating every itinerary
+def test_busca_igual_a_forca_bruta():
+    graph = RouteGraph(TRECHOS_CICLICOS)
+    legs = graph.candidate_legs('Delhi', 'Mumbai', 'Economy', max_legs=3)
+    prices = precificar_ciclico(legs)
+    price_of = dict(zip(legs, prices))
+
+    # Every connecting itinerary with one or two connections, without repeated cities
+    all_paths = []
+    for first in legs:
+        if first.from_city != 'Delhi':
+            continue
+        for second in legs:
+            if second.from_city != first.to_city or second.to_city == 'Delhi':
+                continue
+            if second.to_city == 'Mumbai':
+                all_paths.append((first, second))
+                continue
+            for third in legs:
+                if third.from_city == second.to_city and third.to_city == 'Mumbai' and third.from_city != first.to_city:
+                    all_paths.append((first, second, third))
+
+    for objective, cost in (('cheapest', lambda path: sum(price_of[leg] for leg in path)),
+                            ('fastest', lambda path: sum(leg.duration for leg in path))):
+        for limit in (1, 3, 10):
+            expected = sorted(cost(path) for path in all_paths)[:limit]
+            found = best_itineraries(legs, prices, 'Delhi', 'Mumbai', objective, max_legs=3, limit=limit)
+            assert [cost([leg for leg, _ in path]) for path in found] == expected
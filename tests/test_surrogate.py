@@ -0,0 +1,80 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from MachineLearning.surrogate import load_surrogate, predict_surrogate
+from distill_surrogate import fit_surrogate
+
+ROTA = ('Indigo', 'Delhi', 'Mumbai', 'Economy', 'Non-stop')
+SURROGATE = {
+    'coefficients': {ROTA: (1000.0, 20.0, -10.0)},
+    'month_offsets': {12: 500.0},
+}
+
+
+class PipelineFalso:
+    # Stands in for modelo_final.pkl: always answers the same price
+    def predict(self, input_df):
+        return np.full(len(input_df), 9999.0)
+
+
+# Test 1: The surrogate applies the route's linear model plus the month offset
+def test_previsao_surrogate(dados_voo):
+    assert predict_surrogate(SURROGATE, dados_voo()) == 1000 + 20 * 180 - 10 * 15 + 500
+    # Months without an offset use the route model alone
+    assert predict_surrogate(SURROGATE, dados_voo(month=1)) == 1000 + 20 * 180 - 10 * 15
+    # Route variants left out of the distillation are not covered
+    assert predict_surrogate(SURROGATE, dados_voo(airline='Vistara')) is None
+
+
+# Test 2: A surrogate distilled from another model version is ignored
+def test_versao_do_surrogate(tmp_path):
+    path = str(tmp_path / 'modelo_surrogate.pkl')
+    assert load_surrogate(path, expected_version='v1') is None
+
+    joblib.dump(dict(SURROGATE, source_model_version='v1'), path)
+    assert load_surrogate(path, expected_version='v1')['coefficients'] == SURROGATE['coefficients']
+    assert load_surrogate(path, expected_version='v2') is None
+
+
+# Test 3: Preview calls use the surrogate and fall back to the full pipeline when it cannot answer
+def test_tiers(monkeypatch, dados_voo, modulo_predict):
+    predict = modulo_predict
+    monkeypatch.setattr(predict, 'pipeline', PipelineFalso())
+    monkeypatch.setattr(predict, 'prediction_cache', None)
+    monkeypatch.setattr(predict, 'surrogate', SURROGATE)
+
+    assert predict.predict_price_tiered(dados_voo(), 'preview') == (4950, 'preview')
+    assert predict.predict_price_tiered(dados_voo(), 'full') == (9999, 'full')
+    assert predict.predict_price_tiered(dados_voo(airline='Vistara'), 'preview') == (9999, 'full')
+
+    # Without a surrogate .pkl every preview is answered by the full pipeline
+    monkeypatch.setattr(predict, 'surrogate', None)
+    assert predict.predict_price_tiered(dados_voo(), 'preview') == (9999, 'full')
+
+
+# Test 4: The distillation recovers the coefficients of a linear price grid
+def test_destilacao():
+    routes = {ROTA: (1000.0, 20.0, -10.0), ('Vistara', 'Delhi', 'Chennai', 'Business', '1-Stop'): (5000.0, 35.0, 4.0)}
+    month_offsets = {1: -300.0, 2: 300.0}
+
+    rows = []
+    for (airline, from_city, to_city, class_category, stops_category), (b0, b1, b2) in routes.items():
+        for duration in (100, 200, 300):
+            for day in (1, 10, 20):
+                for month, offset in month_offsets.items():
+                    rows.append({
+                        'airline': airline, 'from': from_city, 'to': to_city,
+                        'class_category': class_category, 'stops_category': stops_category,
+                        'duration_in_min': float(duration), 'day': day, 'month': month,
+                        'price': b0 + b1 * duration + b2 * day + offset
+                    })
+    samples = pd.DataFrame(rows)
+
+    surrogate = fit_surrogate(samples.drop(columns='price'), samples['price'].to_numpy())
+
+    assert surrogate['month_offsets'] == pytest.approx({1: -300.0, 2: 300.0})
+    for key, coefficients in routes.items():
+        assert np.allclose(surrogate['coefficients'][key], coefficients)
+